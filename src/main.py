@@ -6,6 +6,7 @@ from re import sub, match
 
 # --- Library Imports (No changes here) ---
 try:
+    from aiohttp import ClientResponseError
     from endpoints import (
         fetch_cookies,
         fetch_story_content_zip,
@@ -13,6 +14,7 @@ try:
         fetch_story,
     )
     from epub_generator import EPUBGenerator
+    from exceptions import StoryNotFoundError
     from parser import fetch_image, fetch_tree_images, clean_tree
     LIBRARY_MISSING = False
 except ImportError:
@@ -24,6 +26,142 @@ def ascii_only(string: str):
     string = string.replace(" ", "_")
     return sub(r"[^qwertyuiopasdfghjklzxcvbnmQWERTYUIOPASDFGHJKLZXCVBNM1234567890\-\_)(`~.><\[\]{}]", "", string)
 
+URL_PATTERN = r"(?:https?://)?(www\.)?wattpad\.com/(\d+|story/\d+)(-.*)?"
+
+
+def parse_story_url(url: str):
+    """Return the (ID, mode) pair for a Wattpad story or part URL."""
+    try:
+        id_part = url.split("wattpad.com/")[1]
+        if "story/" in id_part:
+            id_part = id_part.split("story/")[1]
+        ID = id_part.split('-')[0].split('?')[0]
+        mode = "story" if "/story/" in url else "part"
+    except (IndexError, ValueError):
+        raise ValueError("Could not parse the Story ID from the URL.")
+    return ID, mode
+
+
+async def fetch_metadata(ID: str, mode: str, cookies: dict | None):
+    """Fetch story metadata from either a story ID or a part ID."""
+    if mode == "story":
+        return await fetch_story(ID, cookies)
+    return await fetch_story_from_partId(ID, cookies)
+
+
+async def fetch_cover(metadata) -> bytes | None:
+    """Fetch the 512px version of the story cover."""
+    return await fetch_image(metadata["cover"].replace("-256-", "-512-"))
+
+
+class StoryPrefetcher:
+    """
+    Speculatively fetches metadata and cover for the URL being typed, so the
+    download can start from cached results once the user clicks.
+
+    Prefetches are keyed on the (ID, mode) pair of the URL, so editing the
+    slug or query string keeps the running request. Only anonymous requests
+    are prefetched; logged-in downloads always fetch fresh metadata with the
+    user's cookies.
+    """
+
+    def __init__(self, delay: float = 0.6):
+        self.delay = delay
+        self.key = None     # (ID, mode) of the story being prefetched
+        self._loop = None   # Event loop the prefetch tasks run on
+        self._timer = None  # Debounce task, sleeps before starting the fetch
+        self._task = None   # Fetch task, resolves to (metadata, cover_task)
+
+    def schedule(self, url: str):
+        """Debounce a prefetch for `url`, cancelling any stale one. Must be called from the event loop."""
+        url = url.strip()
+        key = None
+        if not LIBRARY_MISSING and match(URL_PATTERN, url):
+            key = parse_story_url(url)
+        if key == self.key:
+            return
+        self.cancel()
+        if key is None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self.key = key
+        self._timer = asyncio.create_task(self._debounce(key))
+
+    def cancel(self):
+        """
+        Drop any pending or finished prefetch. Safe to call from any thread;
+        off the event loop the cancellation is handed over to the loop.
+        """
+        if self._loop is None:
+            return
+        try:
+            on_loop = asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            on_loop = False
+        if on_loop:
+            self._cancel()
+        else:
+            self._loop.call_soon_threadsafe(self._cancel)
+
+    def _cancel(self):
+        # Runs on the loop, so the state can't change under it.
+        timer, task = self._timer, self._task
+        self.key = self._timer = self._task = None
+        if timer and not timer.done():
+            timer.cancel()
+        if task and not task.done():
+            task.cancel()
+        elif task and not task.cancelled() and task.exception() is None:
+            task.result()[1].cancel()  # Abandoned cover fetch
+
+    async def take(self, ID: str, mode: str):
+        """
+        Return the prefetched (metadata, cover_task) for the story, or None
+        on a cache miss. A prefetch still waiting on its debounce is started
+        right away. A definite "not found" answer is raised; any other failure
+        counts as a miss so the caller fetches again.
+        """
+        if (ID, mode) != self.key:
+            self.cancel()
+            return None
+        task = self._task
+        if task is None:
+            self._timer.cancel()
+            task = self._start(self.key)
+        self.key = self._timer = self._task = None
+        try:
+            return await task
+        except StoryNotFoundError:
+            raise
+        except ClientResponseError as e:
+            if 400 <= e.status < 500:
+                raise
+            print(f"Prefetch error: {e}")
+        except Exception as e:
+            print(f"Prefetch error: {e}")
+        return None
+
+    def _start(self, key):
+        self._task = self._spawn(self._fetch(*key))
+        return self._task
+
+    @staticmethod
+    def _spawn(coro):
+        task = asyncio.create_task(coro)
+        # Avoid "exception was never retrieved" warnings for abandoned prefetches.
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        return task
+
+    async def _debounce(self, key):
+        await asyncio.sleep(self.delay)
+        self._start(key)
+
+    async def _fetch(self, ID: str, mode: str):
+        metadata = await fetch_metadata(ID, mode, None)
+        # The cover is its own task, so its failure never fails the metadata step.
+        return metadata, self._spawn(fetch_cover(metadata))
+
+
 # --- Updated Backend Logic ---
 async def download_wattpad_story(
     url: str,
@@ -31,44 +169,47 @@ async def download_wattpad_story(
     password: str,
     download_images: bool,
     status_control: ft.Text,
-    page: ft.Page
+    page: ft.Page,
+    prefetcher: StoryPrefetcher | None = None
 ):
     """
     This is your backend logic. It now saves the file to a temporary location
     in the app's private storage and returns the path to that file.
+
+    If a prefetcher is given, anonymous downloads reuse the metadata and cover
+    it already fetched for this URL.
     """
     # (The initial part of the function for fetching metadata remains the same)
     if LIBRARY_MISSING:
         raise RuntimeError("Could not find library files (endpoints.py, etc.).")
 
-    try:
-        id_part = url.split("wattpad.com/")[1]
-        if "story/" in id_part:
-            id_part = id_part.split("story/")[1]
-        ID = id_part.split('-')[0].split('?')[0]
-        mode = "story" if "/story/" in url else "part"
-    except (IndexError, ValueError):
-        raise ValueError("Could not parse the Story ID from the URL.")
+    ID, mode = parse_story_url(url)
 
     cookies = None
     if username and password:
+        if prefetcher:
+            prefetcher.cancel()  # Prefetched metadata was fetched without cookies
         status_control.value = "Logging in..."; page.update()
         cookies = await fetch_cookies(username, password)
 
     status_control.value = "Checking story accessibility..."; page.update()
     try:
-        if mode == "story":
-            metadata = await fetch_story(ID, cookies)
-        else:
-            metadata = await fetch_story_from_partId(ID, cookies)
+        prefetched = await prefetcher.take(ID, mode) if prefetcher and not cookies else None
+        metadata = prefetched[0] if prefetched else await fetch_metadata(ID, mode, cookies)
         status_control.value = "✅ Story found! Fetching content..."; page.update()
-        await asyncio.sleep(1)
     except Exception as e:
         print(f"Metadata fetch error: {e}")
         raise ConnectionError("Story not found or is inaccessible. It may be deleted, a draft, or require a login.")
 
     status_control.value = "Fetching cover..."; page.update()
-    cover_data = await fetch_image(metadata["cover"].replace("-256-", "-512-"))
+    if prefetched:
+        try:
+            cover_data = await prefetched[1]
+        except Exception as e:
+            print(f"Prefetched cover error: {e}")
+            prefetched = None
+    if not prefetched:
+        cover_data = await fetch_cover(metadata)
     status_control.value = "Fetching story content..."; page.update()
     story_zip_bytes = await fetch_story_content_zip(metadata["id"], cookies)
     archive = ZipFile(story_zip_bytes, "r")
@@ -117,6 +258,7 @@ def main(page: ft.Page):
     # --- UI Reset and Error Handling Logic ---
     def reset_ui():
         """A single function to reset the UI to its initial state."""
+        prefetcher.cancel()
         url_input.value = ""
         username_input.value = ""
         password_input.value = ""
@@ -142,92 +284,97 @@ def main(page: ft.Page):
     # The line `page.dialog = error_dialog` is no longer needed.
     
     temp_file_path_to_save = None
+    prefetcher = StoryPrefetcher()
 
     # --- MODIFIED: In your main() function ---
 
-def save_file_result(e: ft.FilePickerResultEvent):
-    """
-    Callback for when the user has picked a file location.
-    This now copies the temp file to the final destination and cleans up.
-    """
-    nonlocal temp_file_path_to_save
-    save_path_str = e.path
+    def save_file_result(e: ft.FilePickerResultEvent):
+        """
+        Callback for when the user has picked a file location.
+        This now copies the temp file to the final destination and cleans up.
+        """
+        nonlocal temp_file_path_to_save
+        save_path_str = e.path
 
-    # Case 1: User selected a path to save the file
-    if save_path_str and temp_file_path_to_save:
-        try:
-            temp_path = Path(temp_file_path_to_save)
-            dest_path = Path(save_path_str)
+        # Case 1: User selected a path to save the file
+        if save_path_str and temp_file_path_to_save:
+            try:
+                temp_path = Path(temp_file_path_to_save)
+                dest_path = Path(save_path_str)
 
-            # Copy file from temp location to final destination
-            dest_path.write_bytes(temp_path.read_bytes())
+                # Copy file from temp location to final destination
+                dest_path.write_bytes(temp_path.read_bytes())
 
-            # Show success screen
-            switcher.content = success_view
-            page.update()
+                # Show success screen
+                switcher.content = success_view
+                page.update()
 
-        except Exception as ex:
-            error_dialog.content = ft.Text(f"Error saving file: {ex}")
-            page.open(error_dialog)
-        finally:
-            # Clean up the temporary file in all cases
-            if temp_path.exists():
-                temp_path.unlink()
-            temp_file_path_to_save = None
+            except Exception as ex:
+                error_dialog.content = ft.Text(f"Error saving file: {ex}")
+                page.open(error_dialog)
+            finally:
+                # Clean up the temporary file in all cases
+                if temp_path.exists():
+                    temp_path.unlink()
+                temp_file_path_to_save = None
     
-    # Case 2: User cancelled the save dialog
-    else:
-        # If a temp file was created, clean it up
-        if temp_file_path_to_save:
-            temp_path = Path(temp_file_path_to_save)
-            if temp_path.exists():
-                temp_path.unlink()
-            temp_file_path_to_save = None
+        # Case 2: User cancelled the save dialog
+        else:
+            # If a temp file was created, clean it up
+            if temp_file_path_to_save:
+                temp_path = Path(temp_file_path_to_save)
+                if temp_path.exists():
+                    temp_path.unlink()
+                temp_file_path_to_save = None
         
-        # Reset the main UI
-        reset_ui()
+            # Reset the main UI
+            reset_ui()
 
 
-async def process_url_click(e):
-    # This must be declared to modify the variable from the outer scope
-    nonlocal temp_file_path_to_save
+    async def process_url_click(e):
+        # This must be declared to modify the variable from the outer scope
+        nonlocal temp_file_path_to_save
     
-    url_input.error_text = None
-    url_pattern = r"(?:https?://)?(www\.)?wattpad\.com/(\d+|story/\d+)(-.*)?"
-    if not match(url_pattern, url_input.value.strip()):
-        url_input.error_text = "Please enter a valid Wattpad URL."
-        page.update()
-        return
+        url_input.error_text = None
+        if not match(URL_PATTERN, url_input.value.strip()):
+            url_input.error_text = "Please enter a valid Wattpad URL."
+            page.update()
+            return
         
-    switcher.content = progress_view
-    page.update()
+        switcher.content = progress_view
+        page.update()
     
-    try:
-        # --- MODIFIED: Receive temp path and filename ---
-        temp_path, filename = await download_wattpad_story(
-            url=url_input.value.strip(),
-            username=username_input.value.strip(), password=password_input.value,
-            download_images=download_images_switch.value,
-            status_control=status_text, page=page
-        )
-        # Store the path for the save_file_result callback
-        temp_file_path_to_save = temp_path
+        try:
+            # --- MODIFIED: Receive temp path and filename ---
+            temp_path, filename = await download_wattpad_story(
+                url=url_input.value.strip(),
+                username=username_input.value.strip(), password=password_input.value,
+                download_images=download_images_switch.value,
+                status_control=status_text, page=page,
+                prefetcher=prefetcher
+            )
+            # Store the path for the save_file_result callback
+            temp_file_path_to_save = temp_path
         
-        status_text.value = "✅ Success! Choose where to save."
-        page.update()
-        file_picker.save_file(dialog_title="Save Your EPUB", file_name=filename, allowed_extensions=["epub"])
+            status_text.value = "✅ Success! Choose where to save."
+            page.update()
+            file_picker.save_file(dialog_title="Save Your EPUB", file_name=filename, allowed_extensions=["epub"])
 
-    except Exception as ex:
-        # (Error handling logic remains the same)
-        print(f"An unexpected error occurred: {ex}")
-        switcher.content = input_view
-        error_dialog.content = ft.Text(str(ex))
-        page.open(error_dialog)
+        except Exception as ex:
+            # (Error handling logic remains the same)
+            print(f"An unexpected error occurred: {ex}")
+            switcher.content = input_view
+            error_dialog.content = ft.Text(str(ex))
+            page.open(error_dialog)
+
+    async def url_changed(e):
+        """Start a debounced prefetch whenever the URL looks like a valid story link."""
+        prefetcher.schedule(url_input.value)
 
     # (The UI component definitions and layout below are unchanged)
     file_picker = ft.FilePicker(on_result=save_file_result)
     page.overlay.append(file_picker)
-    url_input = ft.TextField(label="Wattpad Story URL", hint_text="https://www.wattpad.com/story/123-your-story", width=400, border_radius=ft.border_radius.all(10), on_submit=process_url_click)
+    url_input = ft.TextField(label="Wattpad Story URL", hint_text="https://www.wattpad.com/story/123-your-story", width=400, border_radius=ft.border_radius.all(10), on_change=url_changed, on_submit=process_url_click)
     username_input = ft.TextField(label="Username", border_radius=ft.border_radius.all(10))
     password_input = ft.TextField(label="Password", border_radius=ft.border_radius.all(10), password=True, can_reveal_password=True)
     advanced_options = ft.ExpansionPanelList(expand_icon_color=ft.Colors.ORANGE_ACCENT, elevation=2, divider_color=ft.Colors.ORANGE_ACCENT, controls=[ft.ExpansionPanel(header=ft.ListTile(title=ft.Text("Advanced Options (for mature/paid stories)")), content=ft.Column([username_input, password_input, ft.Container(height=10)], spacing=5, horizontal_alignment=ft.CrossAxisAlignment.CENTER))])